@@ -1,8 +1,7 @@
 import argparse
 import codecs
-import copy
+from collections import deque
 from functools import partial
-from glob import glob
 import html
 from itertools import chain
 import math
@@ -12,7 +11,6 @@ import sys
 import PIL.ImageFile
 from loguru import logger
 import yaml
-import io
 import json
 import re
 import shutil
@@ -29,6 +27,10 @@ from loguru import logger
 import natsort
 import numpy as np
 import yaml
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 PIL.Image.MAX_IMAGE_PIXELS = None
@@ -38,19 +40,30 @@ __appname__ = 'labelQuad'
 __version__ = '1.2.0'
 
 
-LABEL_COLORMAP = imgviz.label_colormap()
+LABEL_COLORMAP: tuple[tuple[int, int, int], ...] = tuple(tuple(c) for c in imgviz.label_colormap().tolist())
 MODE_CREATE: int = 0
 MODE_EDIT  : int = 1
 ZOOM_MODE_FIT_WINDOW : int = 0
 ZOOM_MODE_FIT_WIDTH  : int = 1
 ZOOM_MODE_MANUAL_ZOOM: int = 2
 MAX_RECENT_FILES: int = 7
+MAX_PERSISTED_VIEWS: int = 500
 CURSOR_DEFAULT: Qt.CursorShape = Qt.CursorShape.ArrowCursor
 CURSOR_POINT  : Qt.CursorShape = Qt.CursorShape.PointingHandCursor
 CURSOR_DRAW   : Qt.CursorShape = Qt.CursorShape.CrossCursor
 CURSOR_MOVE   : Qt.CursorShape = Qt.CursorShape.ClosedHandCursor
 CURSOR_GRAB   : Qt.CursorShape = Qt.CursorShape.OpenHandCursor
 MOVE_SPEED: float = 5.0
+PIXMAP_CACHE_LIMIT: int = 256 * 1024  # KB
+SHAPE_GRID_SIZE: float = 128.0
+DRAG_THRESHOLD: float = 3.0
+FILE_SEARCH_DELAY: int = 200  # msec
+MOUSE_STATUS_INTERVAL: int = 30  # msec
+ZOOM_COALESCE_INTERVAL: int = 16  # msec
+HTML_DOC_CACHE_SIZE: int = 1024
+IMAGE_EXTENSIONS: tuple[str, ...] = ('.jpg', '.jpeg', '.png')
+ICON_CACHE: dict[str, QIcon] = {}
+NATSORT_KEY = natsort.os_sort_keygen()
 
 
 class ToolBar(QToolBar):
@@ -112,12 +125,17 @@ class Shape(object):
     point_type = P_ROUND
     point_size = 8
     scale = 1.0
+    _pens: dict[int, QPen] = {}
 
     def __init__(self,
                  label=None,
                  line_color=None):
         self.label = label
-        self.points = []
+        self._points: list[QPointF] = []
+        self._points_np: Optional[np.ndarray] = None
+        self._path: Optional[QPainterPath] = None
+        self._polygon_cache: Optional[QPolygonF] = None
+        self._bbox: Optional[QRectF] = None
         self.fill = False
         self.selected = False
         self.other_data = {}
@@ -134,33 +152,51 @@ class Shape(object):
             self.line_color = line_color
 
     def __len__(self):
-        return len(self.points)
+        return len(self._points)
 
     def __getitem__(self, key):
-        return self.points[key]
+        return self._points[key]
 
     def __setitem__(self, key, value):
-        self.points[key] = value
+        self._points[key] = value
+        self._invalidate()
+
+    @property
+    def points(self) -> list[QPointF]:
+        return self._points
+
+    @points.setter
+    def points(self, value: list[QPointF]) -> None:
+        self._points = value
+        self._invalidate()
+
+    def setPoints(self, points: list[tuple[float, float]]) -> None:
+        self._points = [QPointF(x, y) for x, y in points]
+        self._invalidate()
+        self._points_np = np.array(points, dtype=np.float64).reshape(-1, 2)
 
     def close(self):
         self._closed = True
 
     def addPoint(self, point):
-        if self.points and point == self.points[0]:
+        if self._points and point == self._points[0]:
             self.close()
         else:
-            self.points.append(point)
+            self._points.append(point)
+            self._invalidate()
 
     def popPoint(self):
-        if self.points:
-            return self.points.pop()
+        if self._points:
+            self._invalidate()
+            return self._points.pop()
         return None
 
     def removePoint(self, i):
-        if len(self.points) <= 3:
-            logger.warning('Cannot remove point from: len(points)=%d', len(self.points))
+        if len(self._points) <= 3:
+            logger.warning('Cannot remove point from: len(points)=%d', len(self._points))
             return
-        self.points.pop(i)
+        self._points.pop(i)
+        self._invalidate()
 
     def isClosed(self):
         return self._closed
@@ -172,19 +208,21 @@ class Shape(object):
         if not self.points:
             return
         color = self.select_line_color if self.selected else self.line_color
-        pen = QPen(color)
-        pen.setWidth(self.PEN_WIDTH)
-        painter.setPen(pen)
+        painter.setPen(self._pen(color))
         if self.points:
             line_path = QPainterPath()
             vrtx_path = QPainterPath()
-            negative_vrtx_path = QPainterPath()
-            line_path.moveTo(self.__scale_point(self.points[0]))
-            for i, p in enumerate(self.points):
-                line_path.lineTo(self.__scale_point(p))
-                self.__draw_vertex(vrtx_path, i)
+            scaled = (self.points_array() * self.scale).tolist()
+            line_path.addPolygon(QTransform.fromScale(self.scale, self.scale).map(self._polygon()))
             if self.isClosed():
-                line_path.lineTo(self.__scale_point(self.points[0]))
+                line_path.closeSubpath()
+            if self._highlightIndex is not None:
+                self._vertex_fill_color = self.hvertex_fill_color
+            else:
+                self._vertex_fill_color = self.vertex_fill_color
+            draw_vertex = self.__draw_vertex
+            for i, (x, y) in enumerate(scaled):
+                draw_vertex(vrtx_path, i, x, y)
             painter.drawPath(line_path)
             if vrtx_path.length() > 0:
                 painter.drawPath(vrtx_path)
@@ -192,34 +230,39 @@ class Shape(object):
             if self.fill:
                 color = self.select_fill_color if self.selected else self.fill_color
                 painter.fillPath(line_path, color)
-            pen.setColor(QColor(255, 0, 0, 255))
-            painter.setPen(pen)
-            painter.drawPath(negative_vrtx_path)
-            painter.fillPath(negative_vrtx_path, QColor(255, 0, 0, 255))
 
     def nearestVertex(self, point, epsilon):
-        min_distance = float('inf')
-        min_i = None
-        point = QPointF(point.x() * self.scale, point.y() * self.scale)
-        for i, p in enumerate(self.points):
-            p = QPointF(p.x() * self.scale, p.y() * self.scale)
-            dist = distance(p - point)
-            if dist <= epsilon and dist < min_distance:
-                min_distance = dist
-                min_i = i
-        return min_i
+        if not self._points:
+            return None
+        s = self.scale
+        arr = self.points_array()
+        dx = (arr[:, 0] - point.x()) * s
+        dy = (arr[:, 1] - point.y()) * s
+        d2 = dx * dx + dy * dy
+        i = int(d2.argmin())
+        return i if d2[i] <= epsilon * epsilon else None
 
     def containsPoint(self, point):
         return self.__make_path().contains(point)
 
     def boundingRect(self):
-        return self.__make_path().boundingRect()
+        if self._bbox is None:
+            self._bbox = self.__make_path().boundingRect()
+        return self._bbox
 
     def moveBy(self, offset):
-        self.points = [p + offset for p in self.points]
+        self._points = [p + offset for p in self._points]
+        if self._points_np is not None:
+            self._points_np += (offset.x(), offset.y())
+        if self._polygon_cache is not None:
+            self._polygon_cache.translate(offset)
+        if self._path is not None:
+            self._path.translate(offset)
+        if self._bbox is not None:
+            self._bbox.translate(offset)
 
     def moveVertexBy(self, i, offset):
-        self.points[i] = self.points[i] + offset
+        self[i] = self._points[i] + offset
 
     def highlightVertex(self, i: int, action: int) -> None:
         self._highlightIndex = i
@@ -229,32 +272,58 @@ class Shape(object):
         self._highlightIndex = None
 
     def copy(self):
-        return copy.deepcopy(self)
-
-    def __draw_vertex(self, path: QPainterPath, i: int) -> None:
+        shape = Shape.__new__(Shape)
+        shape.__dict__.update(self.__dict__)
+        shape._points = [QPointF(p) for p in self._points]
+        shape.other_data = dict(self.other_data)
+        shape._invalidate()
+        return shape
+
+    def __draw_vertex(self, path: QPainterPath, i: int, x: float, y: float) -> None:
         d = self.point_size
         shape = self.point_type
-        point = self.__scale_point(self.points[i])
         if i == self._highlightIndex:
             size, shape = self._highlightSettings[self._highlightMode]
             d *= size
-        if self._highlightIndex is not None:
-            self._vertex_fill_color = self.hvertex_fill_color
-        else:
-            self._vertex_fill_color = self.vertex_fill_color
         if shape == self.P_SQUARE:
-            path.addRect(point.x() - d / 2, point.y() - d / 2, d, d)
+            path.addRect(x - d / 2, y - d / 2, d, d)
         elif shape == self.P_ROUND:
-            path.addEllipse(point, d / 2.0, d / 2.0)
+            path.addEllipse(QPointF(x, y), d / 2.0, d / 2.0)
+
+    @classmethod
+    def _pen(cls, color: QColor) -> QPen:
+        key = color.rgba()
+        pen = cls._pens.get(key)
+        if pen is None:
+            pen = QPen(color)
+            pen.setWidth(cls.PEN_WIDTH)
+            cls._pens[key] = pen
+        return pen
+
+    def points_array(self) -> np.ndarray:
+        if self._points_np is None:
+            self._points_np = np.array([(p.x(), p.y()) for p in self._points], dtype=np.float64).reshape(-1, 2)
+        arr = self._points_np.view()
+        arr.flags.writeable = False
+        return arr
+
+    def _polygon(self) -> QPolygonF:
+        if self._polygon_cache is None:
+            self._polygon_cache = QPolygonF(self._points)
+        return self._polygon_cache
+
+    def _invalidate(self) -> None:
+        self._points_np = None
+        self._path = None
+        self._polygon_cache = None
+        self._bbox = None
 
     def __make_path(self) -> QPainterPath:
-        path = QPainterPath(self.points[0])
-        for p in self.points[1:]:
-            path.lineTo(p)
-        return path
-
-    def __scale_point(self, point: QPointF) -> QPointF:
-        return QPointF(point.x() * self.scale, point.y() * self.scale)
+        if self._path is None:
+            path = QPainterPath()
+            path.addPolygon(self._polygon())
+            self._path = path
+        return self._path
 
 
 class Canvas(QWidget):
@@ -278,7 +347,7 @@ class Canvas(QWidget):
 
         self.mode = MODE_EDIT
         self.shapes: list[Shape] = []
-        self.shapes_backup: list[Shape] = []
+        self.shapes_backup: deque[list[Shape]] = deque(maxlen=self.num_backups + 1)
         self.current = None
         self.selected_shapes: list[Shape] = []
         self.selected_shapes_copy: list[Shape] = []
@@ -288,6 +357,7 @@ class Canvas(QWidget):
         self.offsets = QPoint(), QPoint()
         self.scale = 1.0
         self.pixmap = QPixmap()
+        self._offset_cache: Optional[tuple[float, QPointF]] = None
         self.visible = {}
         self._hideBackround = False
         self.hideBackround = False
@@ -302,6 +372,8 @@ class Canvas(QWidget):
         self._cursor = CURSOR_DEFAULT
         self.menus = [QMenu(), QMenu()]
         self.fill_drawing: bool = False
+        self._shape_grid: Optional[dict[tuple[int, int], list[int]]] = None
+        self._vertex_selected: bool = False
 
         self.setMouseTracking(True)
         self.setFocusPolicy(Qt.FocusPolicy.WheelFocus)
@@ -370,7 +442,7 @@ class Canvas(QWidget):
         if self.drawing():
             self.overrideCursor(CURSOR_DRAW)
             if not self.current:
-                self.repaint()
+                self.update()
                 return
 
             if (self.snapping) and \
@@ -380,7 +452,7 @@ class Canvas(QWidget):
                 self.overrideCursor(CURSOR_POINT)
                 self.current.highlightVertex(0, Shape.NEAR_VERTEX)
             self.line.points = [self.current[-1], pos]
-            self.repaint()
+            self.update()
             self.current.highlightClear()
             return
 
@@ -388,29 +460,35 @@ class Canvas(QWidget):
             if self.selected_shapes_copy and self.prevPoint:
                 self.overrideCursor(CURSOR_MOVE)
                 self.__move_shapes(self.selected_shapes_copy, pos)
-                self.repaint()
+                self.update()
             elif self.selected_shapes:
-                self.selected_shapes_copy = [s.copy() for s in self.selected_shapes]
-                self.repaint()
+                d = (pos - self.prevPoint) * self.scale
+                if d.x() * d.x() + d.y() * d.y() > DRAG_THRESHOLD * DRAG_THRESHOLD:
+                    self.selected_shapes_copy = [s.copy() for s in self.selected_shapes]
+                    self.update()
             return
 
         if Qt.MouseButton.LeftButton & event.buttons():
             if self.selectedVertex():
                 self.__move_vertex(pos)
-                self.repaint()
+                self.update()
                 self.movingShape = True
             elif self.selected_shapes and self.prevPoint:
                 self.overrideCursor(CURSOR_MOVE)
                 self.__move_shapes(self.selected_shapes, pos)
-                self.repaint()
+                self.update()
                 self.movingShape = True
             return
 
         self.setToolTip(self.tr('Image'))
-        shapes_visible: list[Shape] = [shape for shape in self.shapes if self.isVisible(shape)]
+        margin = self.epsilon / self.scale
+        shapes_visible: list[Shape] = [shape for shape in self.__shapes_near(pos, margin) if self.isVisible(shape)]
         shapes_selected: list[Shape] = [shape for shape in shapes_visible if shape.selected]
         shapes_not_selected: list[Shape] = [shape for shape in shapes_visible if not shape.selected]
+        highlighted_shape = self.highlighted_shape
         for shape in chain(shapes_selected, shapes_not_selected):
+            if not shape.boundingRect().adjusted(-margin, -margin, margin, margin).contains(pos):
+                continue
             index = shape.nearestVertex(pos, self.epsilon)
             if index is not None:
                 if self.selectedVertex():
@@ -422,7 +500,7 @@ class Canvas(QWidget):
                 self.setToolTip(self.tr('Click & Drag to move point\n'
                                         'ALT + SHIFT + Click to delete point'))
                 self.setStatusTip(self.toolTip())
-                self.update()
+                self.__update_shapes(highlighted_shape, shape)
                 break
             elif shape.containsPoint(pos):
                 if self.selectedVertex():
@@ -433,11 +511,14 @@ class Canvas(QWidget):
                 self.setToolTip(self.tr('Click & drag to move shape "%s"') % shape.label)
                 self.setStatusTip(self.toolTip())
                 self.overrideCursor(CURSOR_GRAB)
-                self.update()
+                self.__update_shapes(highlighted_shape, shape)
                 break
         else:
             self.unHighlight()
-        self.vertex_selected_signal.emit(self.highlighted_vertex is not None)
+        vertex_selected = self.highlighted_vertex is not None
+        if vertex_selected != self._vertex_selected:
+            self._vertex_selected = vertex_selected
+            self.vertex_selected_signal.emit(vertex_selected)
 
     def mousePressEvent(self, event: QMouseEvent) -> None:
         pos = self.__transform_pos(event.localPos())
@@ -460,13 +541,13 @@ class Canvas(QWidget):
                 group_mode = int(event.modifiers()) == Qt.KeyboardModifier.ControlModifier
                 self.__select_shape_point(pos, multiple_selection_mode=group_mode)
                 self.prevPoint = pos
-                self.repaint()
+                self.update()
         elif event.button() == Qt.MouseButton.RightButton and self.editing():
             group_mode = int(event.modifiers()) == Qt.KeyboardModifier.ControlModifier
             if (not self.selected_shapes) or \
                ((self.highlighted_shape is not None) and (self.highlighted_shape not in self.selected_shapes)):
                 self.__select_shape_point(pos, multiple_selection_mode=group_mode)
-                self.repaint()
+                self.update()
             self.prevPoint = pos
 
     def mouseReleaseEvent(self, event: QMouseEvent) -> None:
@@ -502,17 +583,28 @@ class Canvas(QWidget):
         p.setRenderHint(QPainter.RenderHint.HighQualityAntialiasing)
         p.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
 
-        p.scale(self.scale, self.scale)
-        p.translate(self.offsetToCenter())
+        scale = self.scale
+        offset = self.offsetToCenter()
+        p.scale(scale, scale)
+        p.translate(offset)
 
         p.drawPixmap(0, 0, self.pixmap)
 
-        p.scale(1 / self.scale, 1 / self.scale)
+        p.scale(1 / scale, 1 / scale)
+
+        m = Shape.point_size * 4 + Shape.PEN_WIDTH
+        dirty = QRectF(event.rect()).adjusted(-m, -m, m, m)
+        dirty = QRectF(dirty.left() / scale - offset.x(), dirty.top() / scale - offset.y(),
+                       dirty.width() / scale, dirty.height() / scale)
 
-        Shape.scale = self.scale
+        Shape.scale = scale
+        highlighted_shape = self.highlighted_shape
+        hide_background = self._hideBackround
         for shape in self.shapes:
-            if (shape.selected or not self._hideBackround) and self.isVisible(shape):
-                shape.fill = shape.selected or shape == self.highlighted_shape
+            if not shape.boundingRect().adjusted(-1, -1, 1, 1).intersects(dirty):
+                continue
+            if (shape.selected or not hide_background) and self.isVisible(shape):
+                shape.fill = shape.selected or shape is highlighted_shape
                 shape.paint(p)
         if self.current:
             self.current.paint(p)
@@ -524,12 +616,14 @@ class Canvas(QWidget):
         if (self.fill_drawing) and \
            (self.current is not None) and \
            (len(self.current.points) >= 2):
-            drawing_shape = self.current.copy()
-            if drawing_shape.fill_color.getRgb()[3] == 0:
-                drawing_shape.fill_color.setAlpha(64)
-            drawing_shape.addPoint(self.line[1])
-            drawing_shape.fill = True
-            drawing_shape.paint(p)
+            fill_color = self.current.fill_color
+            if fill_color.alpha() == 0:
+                fill_color = QColor(fill_color)
+                fill_color.setAlpha(64)
+            preview = QPainterPath()
+            preview.addPolygon(QTransform.fromScale(scale, scale).map(
+                QPolygonF(self.current.points + [self.line[1]])))
+            p.fillPath(preview, fill_color)
         p.end()
 
     def wheelEvent(self, event: QWheelEvent) -> None:
@@ -549,8 +643,6 @@ class Canvas(QWidget):
         shapesBackup = []
         for shape in self.shapes:
             shapesBackup.append(shape.copy())
-        if len(self.shapes_backup) > self.num_backups:
-            self.shapes_backup = self.shapes_backup[-self.num_backups - 1 :]
         self.shapes_backup.append(shapesBackup)
 
     def is_shape_restorable(self) -> bool:
@@ -564,6 +656,7 @@ class Canvas(QWidget):
         self.shapes_backup.pop()
         shapesBackup = self.shapes_backup.pop()
         self.shapes = shapesBackup
+        self._shape_grid = None
         self.selected_shapes = []
         for shape in self.shapes:
             shape.selected = False
@@ -581,7 +674,7 @@ class Canvas(QWidget):
     def setEditing(self, value: bool = True) -> None:
         self.mode = MODE_EDIT if value else MODE_CREATE
         if self.mode == MODE_EDIT:
-            self.repaint()
+            self.update()
         else:
             self.unHighlight()
             self.deSelectShape()
@@ -589,7 +682,7 @@ class Canvas(QWidget):
     def unHighlight(self):
         if self.highlighted_shape:
             self.highlighted_shape.highlightClear()
-            self.update()
+            self.__update_shapes(self.highlighted_shape)
         self.highlighted_shape_prev = self.highlighted_shape
         self.highlighted_vertex_prev = self.highlighted_vertex
         self.highlighted_shape = self.highlighted_vertex = None
@@ -604,12 +697,13 @@ class Canvas(QWidget):
             self.selected_shapes = []
             self.selected_shapes_copy = []
             return
+        self._shape_grid = None
         for i, shape in enumerate(self.selected_shapes_copy):
             self.shapes.append(shape)
             self.selected_shapes[i].selected = False
             self.selected_shapes[i] = shape
         self.selected_shapes_copy = []
-        self.repaint()
+        self.update()
         self.store_shapes()
 
     def hideBackroundShapes(self, value):
@@ -641,6 +735,7 @@ class Canvas(QWidget):
     def deleteSelected(self):
         deleted_shapes = []
         if self.selected_shapes:
+            self._shape_grid = None
             for shape in self.selected_shapes:
                 self.shapes.remove(shape)
                 deleted_shapes.append(shape)
@@ -651,18 +746,23 @@ class Canvas(QWidget):
 
     def offsetToCenter(self):
         s = self.scale
+        if self._offset_cache is not None and self._offset_cache[0] == s:
+            return self._offset_cache[1]
         area = super(Canvas, self).size()
         w, h = self.pixmap.width() * s, self.pixmap.height() * s
         aw, ah = area.width(), area.height()
         x = (aw - w) / (2 * s) if aw > w else 0
         y = (ah - h) / (2 * s) if ah > h else 0
-        return QPointF(x, y)
+        offset = QPointF(x, y)
+        self._offset_cache = (s, offset)
+        return offset
 
     def finalise(self):
         assert self.current
         self.current.close()
 
         self.shapes.append(self.current)
+        self._shape_grid = None
         self.store_shapes()
         self.current = None
         self.setHiding(False)
@@ -670,7 +770,9 @@ class Canvas(QWidget):
         self.update()
 
     def closeEnough(self, p1, p2):
-        return distance(p1 - p2) < (self.epsilon / self.scale)
+        d = p1 - p2
+        eps = self.epsilon / self.scale
+        return d.x() * d.x() + d.y() * d.y() < eps * eps
 
     def sizeHint(self):
         return self.minimumSizeHint()
@@ -683,13 +785,13 @@ class Canvas(QWidget):
     def set_last_label(self, text: str) -> None:
         assert text
         self.shapes[-1].label = text
-        self.shapes_backup.pop()
-        self.store_shapes()
+        self.shapes_backup[-1][-1].label = text
         return self.shapes[-1]
 
     def undo_last_line(self) -> None:
         assert self.shapes
         self.current = self.shapes.pop()
+        self._shape_grid = None
         self.current.setOpen()
         self.line.points = [self.current[-1], self.current[0]]
         self.drawing_polygon_signal.emit(True)
@@ -707,8 +809,10 @@ class Canvas(QWidget):
 
     def load_pixmap(self, pixmap: QPixmap, clear_shapes: bool = True) -> None:
         self.pixmap = pixmap
+        self._offset_cache = None
         if clear_shapes:
             self.shapes = []
+            self._shape_grid = None
         self.update()
 
     def load_shapes(self, shapes: list[Shape], replace: bool = True) -> None:
@@ -716,15 +820,29 @@ class Canvas(QWidget):
             self.shapes = list(shapes)
         else:
             self.shapes.extend(shapes)
+        self._shape_grid = None
         self.store_shapes()
         self.current = None
         self.highlighted_shape = None
         self.highlighted_vertex = None
         self.update()
 
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        self._offset_cache = None
+        super(Canvas, self).resizeEvent(event)
+
     def setShapeVisible(self, shape, value):
+        if self.visible.get(shape, True) == value:
+            return
         self.visible[shape] = value
-        self.update()
+        self.__update_shapes(shape)
+
+    def setShapesVisible(self, visibility: dict[Shape, bool]) -> None:
+        changed = [shape for shape, value in visibility.items() if self.visible.get(shape, True) != value]
+        if not changed:
+            return
+        self.visible.update(visibility)
+        self.__update_shapes(*changed)
 
     def overrideCursor(self, cursor):
         self.restoreCursor()
@@ -737,7 +855,8 @@ class Canvas(QWidget):
     def resetState(self):
         self.restoreCursor()
         self.pixmap = None
-        self.shapes_backup = []
+        self._offset_cache = None
+        self.shapes_backup = deque(maxlen=self.num_backups + 1)
         self.update()
 
     def __calculate_offsets(self, point: QPointF) -> None:
@@ -745,16 +864,11 @@ class Canvas(QWidget):
         right = 0
         top = self.pixmap.height() - 1
         bottom = 0
-        for s in self.selected_shapes:
-            rect = s.boundingRect()
-            if rect.left() < left:
-                left = rect.left()
-            if rect.right() > right:
-                right = rect.right()
-            if rect.top() < top:
-                top = rect.top()
-            if rect.bottom() > bottom:
-                bottom = rect.bottom()
+        if self.selected_shapes:
+            pts = np.concatenate([s.points_array() for s in self.selected_shapes])
+            (min_x, min_y), (max_x, max_y) = pts.min(axis=0).tolist(), pts.max(axis=0).tolist()
+            left, top = min(left, min_x), min(top, min_y)
+            right, bottom = max(right, max_x), max(bottom, max_y)
         x1 = left - point.x()
         y1 = top - point.y()
         x2 = right - point.x()
@@ -766,7 +880,7 @@ class Canvas(QWidget):
             index, shape = self.highlighted_vertex, self.highlighted_shape
             shape.highlightVertex(index, shape.MOVE_VERTEX)
             return
-        for shape in reversed(self.shapes):
+        for shape in reversed(self.__shapes_near(point)):
             if self.isVisible(shape) and shape.containsPoint(point):
                 self.setHiding()
                 if shape not in self.selected_shapes:
@@ -784,12 +898,13 @@ class Canvas(QWidget):
     def __move_by_keyboard(self, offset: QPointF) -> None:
         if self.selected_shapes:
             self.__move_shapes(self.selected_shapes, self.prevPoint + offset)
-            self.repaint()
+            self.update()
             self.movingShape = True
 
     def __move_shapes(self, shapes: list[Shape], pos: QPointF) -> None:
         dp = pos - self.prevPoint
         if dp:
+            self._shape_grid = None
             for shape in shapes:
                 shape.moveBy(dp)
             self.prevPoint = pos
@@ -800,6 +915,42 @@ class Canvas(QWidget):
         index, shape = self.highlighted_vertex, self.highlighted_shape
         point = shape[index]
         shape.moveVertexBy(index, pos - point)
+        self._shape_grid = None
+
+    def __update_shapes(self, *shapes: Optional[Shape]) -> None:
+        rects = [shape.boundingRect() for shape in shapes if shape is not None and shape.points]
+        if not rects:
+            return
+        rect = rects[0]
+        for r in rects[1:]:
+            rect = rect.united(r)
+        s = self.scale
+        offset = self.offsetToCenter()
+        m = Shape.point_size * 4 + Shape.PEN_WIDTH
+        self.update(QRectF((rect.left() + offset.x()) * s - m, (rect.top() + offset.y()) * s - m,
+                           rect.width() * s + 2 * m, rect.height() * s + 2 * m).toAlignedRect())
+
+    def __shapes_near(self, point: QPointF, margin: float = 0.0) -> list[Shape]:
+        if self._shape_grid is None:
+            self.__build_shape_grid()
+        g = SHAPE_GRID_SIZE
+        x0, x1 = math.floor((point.x() - margin) / g), math.floor((point.x() + margin) / g)
+        y0, y1 = math.floor((point.y() - margin) / g), math.floor((point.y() + margin) / g)
+        indices = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                indices.update(self._shape_grid.get((cx, cy), ()))
+        return [self.shapes[i] for i in sorted(indices)]
+
+    def __build_shape_grid(self) -> None:
+        g = SHAPE_GRID_SIZE
+        grid: dict[tuple[int, int], list[int]] = {}
+        for i, shape in enumerate(self.shapes):
+            rect = shape.boundingRect()
+            for cx in range(math.floor(rect.left() / g), math.floor(rect.right() / g) + 1):
+                for cy in range(math.floor(rect.top() / g), math.floor(rect.bottom() / g) + 1):
+                    grid.setdefault((cx, cy), []).append(i)
+        self._shape_grid = grid
 
     def __transform_pos(self, point: QPointF) -> QPointF:
         return point / self.scale - self.offsetToCenter()
@@ -836,9 +987,10 @@ class UniqueLabelQListWidget(EscapableQListWidget):
     def setItemLabel(self, item, label, color=None) -> None:
         qlabel = QLabel()
         if color is None:
-            qlabel.setText('{}'.format(label))
+            qlabel.setText(f'{label}')
         else:
-            qlabel.setText('{} <font color="#{:02x}{:02x}{:02x}">●</font>'.format(html.escape(label), *color))
+            r, g, b = color
+            qlabel.setText(f'{html.escape(label)} <font color="#{r:02x}{g:02x}{b:02x}">●</font>')
         qlabel.setAlignment(Qt.AlignmentFlag.AlignBottom)
         item.setSizeHint(qlabel.sizeHint())
         self.setItemWidget(item, qlabel)
@@ -865,6 +1017,7 @@ class HTMLDelegate(QStyledItemDelegate):
     def __init__(self, parent=None) -> None:
         super(HTMLDelegate, self).__init__()
         self.doc = QTextDocument(self)
+        self._docs: dict[str, QTextDocument] = {}
 
     def paint(self, painter, option, index):
         painter.save()
@@ -872,7 +1025,7 @@ class HTMLDelegate(QStyledItemDelegate):
         options = QStyleOptionViewItem(option)
 
         self.initStyleOption(options, index)
-        self.doc.setHtml(options.text)
+        self.doc = self.__document(options.text)
         options.text = ''
 
         style = QApplication.style() if (options.widget is None) else options.widget.style()
@@ -903,6 +1056,18 @@ class HTMLDelegate(QStyledItemDelegate):
 
         painter.restore()
 
+    def __document(self, html: str) -> QTextDocument:
+        doc = self._docs.get(html)
+        if doc is None:
+            if len(self._docs) >= HTML_DOC_CACHE_SIZE:
+                for d in self._docs.values():
+                    d.deleteLater()
+                self._docs.clear()
+            doc = QTextDocument(self)
+            doc.setHtml(html)
+            self._docs[html] = doc
+        return doc
+
     def sizeHint(self, option, index):
         thefuckyourshitup_constant = 4
         return QSize(
@@ -1000,8 +1165,8 @@ class LabelListWidget(QListView):
     def addItem(self, item):
         if not isinstance(item, LabelListWidgetItem):
             raise TypeError('item must be LabelListWidgetItem')
-        self.model().setItem(self.model().rowCount(), 0, item)
         item.setSizeHint(self.itemDelegate().sizeHint(None, None))
+        self.model().setItem(self.model().rowCount(), 0, item)
 
     def removeItem(self, item):
         index = self.model().indexFromItem(item)
@@ -1011,13 +1176,6 @@ class LabelListWidget(QListView):
         index = self.model().indexFromItem(item)
         self.selectionModel().select(index, QItemSelectionModel.Select)
 
-    def findItemByShape(self, shape):
-        for row in range(self.model().rowCount()):
-            item = self.model().item(row, 0)
-            if item.shape() == shape:
-                return item
-        raise ValueError('cannot find shape: {}'.format(shape))
-
     def clear(self):
         self.model().clear()
 
@@ -1057,6 +1215,7 @@ class LabelDialog(QDialog):
         if self._fit_to_content['column']:
             self.label_list_widget.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self._sort_labels = sort_labels
+        self._label_history: set[str] = set(labels or [])
         if labels:
             self.label_list_widget.addItems(labels)
         if self._sort_labels:
@@ -1105,8 +1264,9 @@ class LabelDialog(QDialog):
             return None
 
     def add_label_history(self, label: str) -> None:
-        if self.label_list_widget.findItems(label, Qt.MatchFlag.MatchExactly):
+        if label in self._label_history:
             return
+        self._label_history.add(label)
         self.label_list_widget.addItem(label)
         if self._sort_labels:
             self.label_list_widget.sortItems()
@@ -1182,13 +1342,7 @@ class BrightnessContrastDialog(QDialog):
     def value_changed(self, _: Optional[int]) -> None:
         brightness = self.slider_brightness.value() / self._base_value
         contrast = self.slider_contrast.value() / self._base_value
-        img = self.img
-        if brightness != 1:
-            img = PIL.ImageEnhance.Brightness(img).enhance(brightness)
-        if contrast != 1:
-            img = PIL.ImageEnhance.Contrast(img).enhance(contrast)
-        qimage = QImage(img.tobytes(), img.width, img.height, img.width * 3, QImage.Format.Format_RGB888)
-        self.callback(qimage)
+        self.callback(adjust_brightness_contrast(self.img, brightness, contrast))
 
 
 class ShowInfoAction(QAction):
@@ -1205,8 +1359,77 @@ class ShowInfoAction(QAction):
         QMB.information(self.parent(), 'Information', msg)
 
 
+class ImageScanSignals(QObject):
+    finished = pyqtSignal(int, str, object, list)
+
+
+class ImageScanWorker(QRunnable):
+
+    def __init__(self, token: int, dir_path: str, mtime: int) -> None:
+        super(ImageScanWorker, self).__init__()
+        self.token = token
+        self.dir_path = dir_path
+        self.mtime = mtime
+        self.signals = ImageScanSignals()
+
+    def run(self) -> None:
+        try:
+            names = sorted(scan_image_names(self.dir_path), key=NATSORT_KEY)
+        except OSError:
+            names = []
+        self.signals.finished.emit(self.token, self.dir_path, self.mtime, names)
+
+
+class RecentFilesCheckSignals(QObject):
+    finished = pyqtSignal(dict)
+
+
+class RecentFilesCheckWorker(QRunnable):
+
+    def __init__(self, files: list[str]) -> None:
+        super(RecentFilesCheckWorker, self).__init__()
+        self.files = files
+        self.signals = RecentFilesCheckSignals()
+
+    def run(self) -> None:
+        self.signals.finished.emit({f: osp.exists(f) for f in self.files})
+
+
+class AnnotSaveSignals(QObject):
+    finished = pyqtSignal(object)
+
+
+class AnnotSaveWorker(QRunnable):
+
+    def __init__(self, image_path: str, path: str, data: bytes) -> None:
+        super(AnnotSaveWorker, self).__init__()
+        self.image_path = image_path
+        self.path = path
+        self.data = data
+        self.error: Optional[str] = None
+        self.done = QSemaphore()
+        self.signals = AnnotSaveSignals()
+
+    def run(self) -> None:
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(self.data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.error = str(e)
+            logger.error('Failed to save annotation: {} ({})'.format(self.path, e))
+        self.done.release()
+        self.signals.finished.emit(self)
+
+
 class MainWindow(QMainWindow):
 
+    _DOCK_FEATURES = (
+        QDockWidget.DockWidgetFeature.DockWidgetClosable |
+        QDockWidget.DockWidgetFeature.DockWidgetFloatable |
+        QDockWidget.DockWidgetFeature.DockWidgetMovable)
+
     def __init__(self, config=None) -> None:
 
         if config is None:
@@ -1226,20 +1449,40 @@ class MainWindow(QMainWindow):
 
         self.image_dir: Optional[str] = None
         self.annot_dir: Optional[str] = None
+        self.image_names: list[str] = []
+        self._file_items: dict[str, QListWidgetItem] = {}
+        self._scan_cache: dict[str, tuple[int, list[str]]] = {}
+        self._scan_token: int = 0
+        self._scan_request: tuple[Optional[str], bool] = (None, True)
+        self._scan_worker: Optional[ImageScanWorker] = None
+        self._search_pattern: tuple[str, Optional[re.Pattern]] = ('', None)
+        self._save_pool = QThreadPool(self)
+        self._save_pool.setMaxThreadCount(1)
+        self._save_workers: list[AnnotSaveWorker] = []
         self.dirty: bool = False
         self.image: QImage = QImage()
         self.image_path: Optional[str] = None
-        self.image_data: Optional[bytes] = None
         self.zoom_mode = ZOOM_MODE_FIT_WINDOW
         self.zoom_level = 100
         self.zoom_values: dict[str, tuple[int, int]] = {}  # key=filename, value=(zoom_mode, zoom_value)
-        self.recent_files: list[str] = []
+        self._first_load: bool = True
+        self._dirty_policy: Optional[int] = None
+        self._fit_scale: tuple[Optional[tuple], int] = (None, 100)
+        self.recent_files: deque[str] = deque(maxlen=MAX_RECENT_FILES)
+        self._recent_exists: dict[str, bool] = {}
+        self._recent_check_worker: Optional[RecentFilesCheckWorker] = None
         self.brightness_contrast_values = {}
         self.scroll_values = {
             Qt.Orientation.Horizontal: {},
             Qt.Orientation.Vertical: {}}
         self._noSelectionSlot = False
         self._copied_shapes = None
+        self._label_rows: dict[str, int] = {}
+        self._label_rgbs: dict[str, tuple[int, int, int]] = {}
+        self._label_colors: dict[str, tuple[QColor, ...]] = {}
+        self._label_htmls: dict[str, str] = {}
+        self._recent_menu_key: Optional[tuple] = None
+        self._item_by_shape: dict[Shape, LabelListWidgetItem] = {}
 
         self.label_dialog = LabelDialog(
             parent=self,
@@ -1252,17 +1495,10 @@ class MainWindow(QMainWindow):
         self.label_list = UniqueLabelQListWidget()
         if self._config['labels']:
             for label in self._config['labels']:
-                item = self.label_list.createItemFromLabel(label)
-                self.label_list.addItem(item)
-                rgb = self.__get_rgb_by_label(label)
-                self.label_list.setItemLabel(item, label, rgb)
+                self.__add_label(label)
         self.label_dock = QDockWidget(self.tr('Labels'), self)
         self.label_dock.setObjectName('Label List')
-        self.label_dock.setFeatures(
-            QDockWidget.DockWidgetFeatures() |
-            QDockWidget.DockWidgetFeature.DockWidgetClosable |
-            QDockWidget.DockWidgetFeature.DockWidgetFloatable |
-            QDockWidget.DockWidgetFeature.DockWidgetMovable)
+        self.label_dock.setFeatures(self._DOCK_FEATURES)
         self.label_dock.setWidget(self.label_list)
 
         self.quad_list = LabelListWidget()
@@ -1272,16 +1508,16 @@ class MainWindow(QMainWindow):
         self.quad_list.itemDropped.connect(self.__label_order_changed)
         self.quad_dock = QDockWidget(self.tr('Quads'), self)
         self.quad_dock.setObjectName('Labels')
-        self.quad_dock.setFeatures(
-            QDockWidget.DockWidgetFeatures() |
-            QDockWidget.DockWidgetFeature.DockWidgetClosable |
-            QDockWidget.DockWidgetFeature.DockWidgetFloatable |
-            QDockWidget.DockWidgetFeature.DockWidgetMovable)
+        self.quad_dock.setFeatures(self._DOCK_FEATURES)
         self.quad_dock.setWidget(self.quad_list)
 
         self.file_search = QLineEdit()
         self.file_search.setPlaceholderText(self.tr('Search Filename'))
-        self.file_search.textChanged.connect(self.__file_search_changed)
+        self.file_search_timer = QTimer(self)
+        self.file_search_timer.setSingleShot(True)
+        self.file_search_timer.setInterval(FILE_SEARCH_DELAY)
+        self.file_search_timer.timeout.connect(self.__file_search_changed)
+        self.file_search.textChanged.connect(self.__file_search_edited)
         self.file_list = QListWidget()
         self.file_list.itemSelectionChanged.connect(self.__file_selection_changed)
         file_list_layout = QVBoxLayout()
@@ -1293,11 +1529,7 @@ class MainWindow(QMainWindow):
         file_list_widget.setLayout(file_list_layout)
         self.file_dock = QDockWidget(self.tr('Files'), self)
         self.file_dock.setObjectName('Files')
-        self.file_dock.setFeatures(
-            QDockWidget.DockWidgetFeatures() |
-            QDockWidget.DockWidgetFeature.DockWidgetClosable |
-            QDockWidget.DockWidgetFeature.DockWidgetFloatable |
-            QDockWidget.DockWidgetFeature.DockWidgetMovable)
+        self.file_dock.setFeatures(self._DOCK_FEATURES)
         self.file_dock.setWidget(file_list_widget)
 
         self.setAcceptDrops(True)
@@ -1307,7 +1539,18 @@ class MainWindow(QMainWindow):
             double_click=self._config['canvas']['double_click'],
             num_backups=self._config['canvas']['num_backups'])
         self.canvas.zoom_request_signal.connect(self.__zoom_request)
-        self.canvas.mouse_moved_signal.connect(lambda pos: self.__status(f'Mouse is at: x={pos.x():.2f}, y={pos.y():.2f}'))
+        self.zoom_steps: int = 0
+        self.zoom_pos: Optional[QPoint] = None
+        self.zoom_timer = QTimer(self)
+        self.zoom_timer.setSingleShot(True)
+        self.zoom_timer.setInterval(ZOOM_COALESCE_INTERVAL)
+        self.zoom_timer.timeout.connect(self.__flush_zoom_request)
+        self.mouse_pos: Optional[QPointF] = None
+        self.mouse_status_timer = QTimer(self)
+        self.mouse_status_timer.setSingleShot(True)
+        self.mouse_status_timer.setInterval(MOUSE_STATUS_INTERVAL)
+        self.mouse_status_timer.timeout.connect(self.__flush_mouse_status)
+        self.canvas.mouse_moved_signal.connect(self.__mouse_moved)
 
         scroll_area = QScrollArea()
         scroll_area.setWidget(self.canvas)
@@ -1335,19 +1578,19 @@ class MainWindow(QMainWindow):
         self.action_open_next = self.__new_action(self.tr('&Next Image'), slot=self.__open_next, shortcut=shortcuts['open_next'], icon='next', tip=self.tr('Open next (hold Ctl+Shift to copy labels)'), enabled=False)
         self.action_open_prev = self.__new_action(self.tr('&Prev Image'), slot=self.__open_prev, shortcut=shortcuts['open_prev'], icon='prev', tip=self.tr('Open prev (hold Ctl+Shift to copy labels)'), enabled=False)
         self.action_save = self.__new_action(self.tr('&Save\n'), slot=self.__save, shortcut=shortcuts['save'], icon='save', tip=self.tr('Save labels to file'), enabled=False)
-        self.action_save_auto = self.__new_action(self.tr('Save &Automatically'), slot=lambda x: self.action_save_auto.setChecked(x), icon='save', tip=self.tr('Save automatically'), checkable=True, enabled=True)
+        self.action_save_auto = self.__new_action(self.tr('Save &Automatically'), icon='save', tip=self.tr('Save automatically'), checkable=True, enabled=True)
         self.action_save_auto.setChecked(self._config['auto_save'])
         self.action_close = self.__new_action(self.tr('&Close'), slot=self.__close_file, shortcut=shortcuts['close'], icon='close', tip=self.tr('Close current file'))
-        self.action_create_mode = self.__new_action(self.tr('Create Quad'), slot=partial(self.__toggle_draw_mode, False), shortcut=shortcuts['create_polygon'], icon='objects', tip=self.tr('Start drawing quad'), enabled=False)
+        self.action_create_mode = self.__new_action(self.tr('Create Quad'), slot=self.__set_create_mode, shortcut=shortcuts['create_polygon'], icon='objects', tip=self.tr('Start drawing quad'), enabled=False)
         self.action_edit_mode = self.__new_action(self.tr('Edit Quad'), slot=self.__set_edit_mode, shortcut=shortcuts['edit_polygon'], icon='edit', tip=self.tr('Move and edit the selected quad'), enabled=False)
         self.action_delete = self.__new_action(self.tr('Delete Quad'), slot=self.__delete_selected_quad, shortcut=shortcuts['delete_polygon'], icon='cancel', tip=self.tr('Delete the selected quad'), enabled=False)
         self.action_copy = self.__new_action(self.tr('Copy Quad'), slot=self.__copy_selected_quad, shortcut=shortcuts['copy_polygon'], icon='copy_clipboard', tip=self.tr('Copy selected quad to clipboard'), enabled=False)
         self.action_paste = self.__new_action(self.tr('Paste Quad'), slot=self.__paste_selected_shape, shortcut=shortcuts['paste_polygon'], icon='paste', tip=self.tr('Paste copied quad'), enabled=False)
         self.action_undo_last_point = self.__new_action(self.tr('Undo last point'), slot=self.canvas.undo_last_point, shortcut=shortcuts['undo_last_point'], icon='undo', tip=self.tr('Undo last drawn point'), enabled=False)
         self.action_undo = self.__new_action(self.tr('Undo\n'), slot=self.__undo_shape_edit, shortcut=shortcuts['undo'], icon='undo', tip=self.tr('Undo last add and edit of shape'), enabled=False)
-        self.action_hide_all = self.__new_action(self.tr('&Hide\nQuad'), slot=partial(self.__toggle_polygons, False), shortcut=shortcuts['hide_all_polygons'], icon='eye', tip=self.tr('Hide all quad'), enabled=False)
-        self.action_show_all = self.__new_action(self.tr('&Show\nQuad'), slot=partial(self.__toggle_polygons, True), shortcut=shortcuts['show_all_polygons'], icon='eye', tip=self.tr('Show all quad'), enabled=False)
-        self.action_toggle_all = self.__new_action(self.tr('&Toggle\nQuad'), slot=partial(self.__toggle_polygons, None), shortcut=shortcuts['toggle_all_polygons'], icon='eye', tip=self.tr('Toggle all quad'), enabled=False)
+        self.action_hide_all = self.__new_action(self.tr('&Hide\nQuad'), slot=self.__hide_all_quads, shortcut=shortcuts['hide_all_polygons'], icon='eye', tip=self.tr('Hide all quad'), enabled=False)
+        self.action_show_all = self.__new_action(self.tr('&Show\nQuad'), slot=self.__show_all_quads, shortcut=shortcuts['show_all_polygons'], icon='eye', tip=self.tr('Show all quad'), enabled=False)
+        self.action_toggle_all = self.__new_action(self.tr('&Toggle\nQuad'), slot=self.__toggle_all_quads, shortcut=shortcuts['toggle_all_polygons'], icon='eye', tip=self.tr('Toggle all quad'), enabled=False)
 
         self.zoom_widget = ZoomWidget()
         zoom_label = QLabel(self.tr('Zoom'))
@@ -1364,9 +1607,9 @@ class MainWindow(QMainWindow):
                     fmtShortcut(self.tr('Ctrl+Wheel'))))
         self.zoom_widget.setEnabled(False)
 
-        self.action_zoom_in = self.__new_action(self.tr('Zoom &In'), slot=partial(self.__add_zoom, 1.1), shortcut=shortcuts['zoom_in'], icon='zoom-in', tip=self.tr('Increase zoom level'), enabled=False)
-        self.action_zoom_out = self.__new_action(self.tr('&Zoom Out'), slot=partial(self.__add_zoom, 0.9), shortcut=shortcuts['zoom_out'], icon='zoom-out', tip=self.tr('Decrease zoom level'), enabled=False)
-        self.action_zoom_org = self.__new_action(self.tr('&Original size'), slot=partial(self.__set_zoom, 100), shortcut=shortcuts['zoom_to_original'], icon='zoom', tip=self.tr('Zoom to original size'), enabled=False)
+        self.action_zoom_in = self.__new_action(self.tr('Zoom &In'), slot=self.__zoom_in, shortcut=shortcuts['zoom_in'], icon='zoom-in', tip=self.tr('Increase zoom level'), enabled=False)
+        self.action_zoom_out = self.__new_action(self.tr('&Zoom Out'), slot=self.__zoom_out, shortcut=shortcuts['zoom_out'], icon='zoom-out', tip=self.tr('Decrease zoom level'), enabled=False)
+        self.action_zoom_org = self.__new_action(self.tr('&Original size'), slot=self.__zoom_org, shortcut=shortcuts['zoom_to_original'], icon='zoom', tip=self.tr('Zoom to original size'), enabled=False)
         self.action_keep_prev_scale = self.__new_action(self.tr('&Keep Previous Scale'), slot=self.__enable_keep_prev_scale, tip=self.tr('Keep previous zoom scale'), checkable=True, checked=self._config['keep_prev_scale'], enabled=True)
         self.action_fit_window = self.__new_action(self.tr('&Fit Window'), slot=self.__set_fit_window, shortcut=shortcuts['fit_window'], icon='fit-window', tip=self.tr('Zoom follows window size'), checkable=True, enabled=False)
         self.action_fit_width = self.__new_action(self.tr('Fit &Width'), slot=self.__set_fit_width, shortcut=shortcuts['fit_width'], icon='fit-width', tip=self.tr('Zoom follows window width'), checkable=True, enabled=False)
@@ -1496,13 +1739,26 @@ class MainWindow(QMainWindow):
             self.__file_search_changed()
 
         self.settings = QSettings('labelQuad', 'labelQuad')
-        self.recent_files = self.settings.value('recent_files', []) or []
+        self.recent_files = deque(self.settings.value('recent_files', []) or [], maxlen=MAX_RECENT_FILES)
+        if self.recent_files:
+            worker = RecentFilesCheckWorker(list(self.recent_files))
+            worker.signals.finished.connect(self.__recent_files_checked)
+            self._recent_check_worker = worker
+            QThreadPool.globalInstance().start(worker)
         size = self.settings.value('window/size', QSize(600, 500))
         position = self.settings.value('window/position', QPoint(0, 0))
         state = self.settings.value('window/state', QByteArray())
         self.resize(size)
         self.move(position)
         self.restoreState(state)
+        try:
+            zoom_values = json.loads(self.settings.value('zoom_values', '') or '{}')
+            scroll_values = json.loads(self.settings.value('scroll_values', '') or '{}')
+        except (TypeError, ValueError):
+            zoom_values, scroll_values = {}, {}
+        self.zoom_values.update((k, tuple(v)) for k, v in list(zoom_values.items())[-MAX_PERSISTED_VIEWS:])
+        self.scroll_values[Qt.Orientation.Horizontal].update(scroll_values.get('horizontal', {}))
+        self.scroll_values[Qt.Orientation.Vertical].update(scroll_values.get('vertical', {}))
 
         self.updateFileMenu()
 
@@ -1511,11 +1767,24 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         if not self.__may_continue():
             event.ignore()
+            return
+        if not self.__flush_saves():
+            event.ignore()
+            return
         self.settings.setValue('filename', self.image_path if self.image_path else '')
         self.settings.setValue('window/size', self.size())
         self.settings.setValue('window/position', self.pos())
         self.settings.setValue('window/state', self.saveState())
-        self.settings.setValue('recent_files', self.recent_files)
+        self.settings.setValue('recent_files', list(self.recent_files))
+        zoom_values = {k: v for k, v in self.zoom_values.items()
+                       if (k is not None) and (v[0] == ZOOM_MODE_MANUAL_ZOOM)}
+        zoom_values = dict(list(zoom_values.items())[-MAX_PERSISTED_VIEWS:])
+        h_values = self.scroll_values[Qt.Orientation.Horizontal]
+        v_values = self.scroll_values[Qt.Orientation.Vertical]
+        self.settings.setValue('zoom_values', json.dumps(zoom_values))
+        self.settings.setValue('scroll_values', json.dumps({
+            'horizontal': {k: h_values[k] for k in zoom_values if k in h_values},
+            'vertical': {k: v_values[k] for k in zoom_values if k in v_values}}))
 
     def resizeEvent(self, event):
         if (self.canvas) and \
@@ -1530,72 +1799,90 @@ class MainWindow(QMainWindow):
         annot_path = self.__current_annot_path()
         if image_path is None:
             return
+        canvas = self.canvas
+        config = self._config
         self.__reset_state()
-        self.canvas.setEnabled(False)
+        canvas.setEnabled(False)
         if not QFile.exists(image_path):
             self.__error_message(
                 self.tr(f'Error opening file'),
                 self.tr(f'No such file: <b>{image_path}</b>'))
         self.__status(self.tr(f'Loading {image_path}...'))
-        image_data = load_image_file(image_path)
-        image = QImage.fromData(image_data)
-        if image.isNull():
-            self.__error_message(
-                self.tr('Error opening file'),
-                self.tr(f'<p>Make sure <i>{image_path}</i> is a valid image file.<br/>'))
-            self.__status(self.tr(f'Error reading {image_path}'))
+        try:
+            pixmap_key = f'{image_path}:{os.stat(image_path).st_mtime_ns}'
+        except OSError:
+            pixmap_key = None
+        pixmap = QPixmapCache.find(pixmap_key) if pixmap_key is not None else None
+        if (pixmap is not None) and (not pixmap.isNull()):
+            image = pixmap.toImage()
+        else:
+            reader = QImageReader(image_path)
+            reader.setAutoTransform(False)
+            image = reader.read()
+            if image.isNull():
+                self.__error_message(
+                    self.tr('Error opening file'),
+                    self.tr(f'<p>Make sure <i>{image_path}</i> is a valid image file.<br/>'))
+                self.__status(self.tr(f'Error reading {image_path}'))
+            pixmap = QPixmap.fromImage(image)
+            if (pixmap_key is not None) and (not image.isNull()):
+                QPixmapCache.insert(pixmap_key, pixmap)
         self.image = image
         self.image_path = image_path
-        self.image_data = image_data
-        self.canvas.load_pixmap(QPixmap.fromImage(self.image))
-
-        if (annot_path is not None) and osp.exists(annot_path):
-            with open(annot_path, 'r') as f:
-                j = json.load(f)
-            quads = []
-            for shape in j['shapes']:
-                label = shape['label']
-                quad = Shape(label=label)
-                quad.addPoint(QPointF(shape['p1x'], shape['p1y']))
-                quad.addPoint(QPointF(shape['p2x'], shape['p2y']))
-                quad.addPoint(QPointF(shape['p3x'], shape['p3y']))
-                quad.addPoint(QPointF(shape['p4x'], shape['p4y']))
-                quad.close()
-                quads.append(quad)
-            self.__load_quads(quads)
-
-        self.__set_clean()
-        self.canvas.setEnabled(True)
-        is_initial_load = not self.zoom_values
-        if self.image_path in self.zoom_values:
-            self.zoom_mode = self.zoom_values[self.image_path][0]
-            self.__set_zoom(self.zoom_values[self.image_path][1])
-        elif is_initial_load or not self._config['keep_prev_scale']:
-            self.__adjust_scale(initial=True)
-        for orientation in self.scroll_values:
-            if self.image_path in self.scroll_values[orientation]:
-                self.__set_scroll(orientation, self.scroll_values[orientation][self.image_path])
-        dialog = BrightnessContrastDialog(
-            img_data_to_pil(self.image_data),
-            self.__on_new_brightness_contrast,
-            parent=self)
-        brightness, contrast = self.brightness_contrast_values.get(self.image_path, (None, None))
-        if self._config['keep_prev_brightness'] and (image_path_prev is not None):
-            brightness, _ = self.brightness_contrast_values.get(image_path_prev, (None, None))
-        if self._config['keep_prev_contrast'] and self.recent_files:
-            _, contrast = self.brightness_contrast_values.get(self.recent_files[0], (None, None))
-        if brightness is not None:
-            dialog.slider_brightness.setValue(brightness)
-        if contrast is not None:
-            dialog.slider_contrast.setValue(contrast)
-        self.brightness_contrast_values[self.image_path] = (brightness, contrast)
-        if (brightness is not None) or (contrast is not None):
-            dialog.value_changed(None)
-
-        self.__paint_canvas()
-        self.__add_recent_file(self.image_path)
+        canvas.setUpdatesEnabled(False)
+        try:
+            canvas.load_pixmap(pixmap)
+
+            if annot_path is not None:
+                self.__wait_for_save(annot_path)
+            if (annot_path is not None) and osp.exists(annot_path):
+                with open(annot_path, 'rb') as f:
+                    data = f.read()
+                j = orjson.loads(data) if orjson is not None else json.loads(data)
+                quads = []
+                for shape in j['shapes']:
+                    quad = Shape(label=shape['label'])
+                    quad.setPoints([
+                        (shape['p1x'], shape['p1y']),
+                        (shape['p2x'], shape['p2y']),
+                        (shape['p3x'], shape['p3y']),
+                        (shape['p4x'], shape['p4y'])])
+                    quad.close()
+                    quads.append(quad)
+                self.__load_quads(quads)
+
+            self.__set_clean()
+            canvas.setEnabled(True)
+            zoom_value = self.zoom_values.get(image_path)
+            if zoom_value is not None:
+                self.zoom_mode = zoom_value[0]
+                self.__set_zoom(zoom_value[1])
+            elif self._first_load or not config['keep_prev_scale']:
+                self.__adjust_scale(initial=True)
+            self._first_load = False
+            for orientation, values in self.scroll_values.items():
+                if image_path in values:
+                    self.__set_scroll(orientation, values[image_path])
+            bc_values = self.brightness_contrast_values
+            brightness, contrast = bc_values.get(image_path, (None, None))
+            if config['keep_prev_brightness'] and (image_path_prev is not None):
+                brightness, _ = bc_values.get(image_path_prev, (None, None))
+            if config['keep_prev_contrast'] and self.recent_files:
+                _, contrast = bc_values.get(self.recent_files[0], (None, None))
+            bc_values[image_path] = (brightness, contrast)
+            if (brightness is not None) or (contrast is not None):
+                base_value = BrightnessContrastDialog._base_value
+                self.__on_new_brightness_contrast(adjust_brightness_contrast(
+                    img_qt_to_pil(image),
+                    (base_value if brightness is None else brightness) / base_value,
+                    (base_value if contrast is None else contrast) / base_value))
+
+            self.__paint_canvas()
+        finally:
+            canvas.setUpdatesEnabled(True)
+        self.__add_recent_file(image_path)
         self.__toggle_actions(True)
-        self.canvas.setFocus()
+        canvas.setFocus()
         self.__status(self.tr(f'Loaded {image_path}'))
 
     def __save(self) -> None:
@@ -1609,38 +1896,78 @@ class MainWindow(QMainWindow):
         image_path = self.image_path
         annot_path = osp.splitext(osp.basename(image_path))[0] + '.json'
         annot_path = osp.join(self.annot_dir, annot_path)
-        def format_shape(s: Shape) -> dict:
-            pts = s.points
+        def format_shape(s: Shape, pts: list[list[float]]) -> dict:
             return dict(
                 label=s.label,
-                p1x=round(pts[0].x(), 2), p1y=round(pts[0].y(), 2),
-                p2x=round(pts[1].x(), 2), p2y=round(pts[1].y(), 2),
-                p3x=round(pts[2].x(), 2), p3y=round(pts[2].y(), 2),
-                p4x=round(pts[3].x(), 2), p4y=round(pts[3].y(), 2))
+                p1x=pts[0][0], p1y=pts[0][1],
+                p2x=pts[1][0], p2y=pts[1][1],
+                p3x=pts[2][0], p3y=pts[2][1],
+                p4x=pts[3][0], p4y=pts[3][1])
         if osp.dirname(annot_path) and not osp.exists(osp.dirname(annot_path)):
             os.makedirs(osp.dirname(annot_path))
-        with open(annot_path, 'w') as f:
-            json.dump({
-                'version': __version__,
-                'path': image_path,
-                'width': self.image.width(),
-                'height': self.image.height(),
-                'shapes': [format_shape(item.shape()) for item in self.quad_list]
-            }, f, ensure_ascii=False, indent=2)
-        items = self.file_list.findItems(image_path, Qt.MatchFlag.MatchExactly)
-        if len(items) == 1:
-            items[0].setCheckState(Qt.CheckState.Checked)
+        quads = [item.shape() for item in self.quad_list]
+        points = np.round(shapes_to_points_array(quads), 2).tolist()
+        annot = {
+            'version': __version__,
+            'path': image_path,
+            'width': self.image.width(),
+            'height': self.image.height(),
+            'shapes': [format_shape(s, pts) for s, pts in zip(quads, points)]}
+        if orjson is not None:
+            data = orjson.dumps(annot, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(annot, ensure_ascii=False, indent=2).encode('utf-8')
+        worker = AnnotSaveWorker(image_path, annot_path, data)
+        worker.signals.finished.connect(self.__annot_saved)
+        self._save_workers.append(worker)
+        self._save_pool.start(worker)
+        item = self._file_items.get(osp.basename(image_path))
+        if (item is not None) and (item.checkState() != Qt.CheckState.Checked):
+            item.setCheckState(Qt.CheckState.Checked)
         self.__set_clean()
 
+    def __annot_saved(self, worker: AnnotSaveWorker) -> bool:
+        if worker not in self._save_workers:
+            return True
+        self._save_workers.remove(worker)
+        if worker.error is None:
+            return True
+        self.__error_message(
+            self.tr('Error saving file'),
+            self.tr(f'Failed to save <b>{worker.path}</b>: {worker.error}'))
+        item = self._file_items.get(osp.basename(worker.image_path))
+        if item is not None:
+            item.setCheckState(Qt.CheckState.Checked if osp.exists(worker.path) else Qt.CheckState.Unchecked)
+        if worker.image_path == self.image_path:
+            self.__mark_dirty()
+        return False
+
+    def __wait_for_save(self, path: str) -> None:
+        for worker in [w for w in self._save_workers if w.path == path]:
+            worker.done.acquire()
+            self.__annot_saved(worker)
+
+    def __flush_saves(self) -> bool:
+        self._save_pool.waitForDone()
+        ok = True
+        for worker in list(self._save_workers):
+            ok = self.__annot_saved(worker) and ok
+        return ok
+
     def __set_dirty(self) -> None:
         self.action_undo.setEnabled(self.canvas.is_shape_restorable())
         if self.action_save_auto.isChecked():
             self.__save()
             return
+        self.__mark_dirty()
+
+    def __mark_dirty(self) -> None:
+        if self.dirty:
+            return
         self.dirty = True
         self.action_save.setEnabled(True)
         title = __appname__
-        file = self.__current_image_path()
+        file = self.image_path
         if file is not None:
             title = f'{title} - {file}*'
         self.setWindowTitle(title)
@@ -1650,7 +1977,7 @@ class MainWindow(QMainWindow):
         self.action_save.setEnabled(False)
         self.action_create_mode.setEnabled(True)
         title = __appname__
-        file = self.__current_image_path()
+        file = self.image_path
         if file is not None:
             title = f'{title} - {file}'
         self.setWindowTitle(title)
@@ -1670,22 +1997,39 @@ class MainWindow(QMainWindow):
     def __status(self, message: str, delay: int = 5000) -> None:
         self.statusBar().showMessage(message, delay)
 
+    def __mouse_moved(self, pos: QPointF) -> None:
+        self.mouse_pos = pos
+        if not self.mouse_status_timer.isActive():
+            self.mouse_status_timer.start()
+
+    def __flush_mouse_status(self) -> None:
+        pos = self.mouse_pos
+        if pos is not None:
+            self.__status(f'Mouse is at: x={pos.x():.2f}, y={pos.y():.2f}')
+
     def __reset_state(self) -> None:
         self.quad_list.clear()
+        self._item_by_shape = {}
         self.image_path = None
-        self.image_data = None
         self.canvas.resetState()
 
     def __add_recent_file(self, image_path: str) -> None:
         if image_path in self.recent_files:
             self.recent_files.remove(image_path)
-        elif MAX_RECENT_FILES <= len(self.recent_files):
-            self.recent_files.pop()
-        self.recent_files.insert(0, image_path)
+        self.recent_files.appendleft(image_path)
+        self._recent_exists[image_path] = True
+
+    def __recent_files_checked(self, result: dict[str, bool]) -> None:
+        self._recent_check_worker = None
+        for f, e in result.items():
+            self._recent_exists.setdefault(f, e)
+        self._recent_menu_key = None
+        self.updateFileMenu()
 
     def __undo_shape_edit(self) -> None:
         self.canvas.restore_shape()
         self.quad_list.clear()
+        self._item_by_shape = {}
         self.__load_quads(self.canvas.shapes)
         self.action_undo.setEnabled(self.canvas.is_shape_restorable())
 
@@ -1703,20 +2047,26 @@ class MainWindow(QMainWindow):
     def __set_edit_mode(self):
         self.__toggle_draw_mode(True)
 
+    def __set_create_mode(self):
+        self.__toggle_draw_mode(False)
+
     def updateFileMenu(self):
         current = None
         if 0 <= self.file_list.currentRow():
             current = self.file_list.currentItem().text()
 
-        def exists(filename):
-            return osp.exists(str(filename))
+        key = (tuple(self.recent_files), current)
+        if key == self._recent_menu_key:
+            return
+        self._recent_menu_key = key
 
         menu = self.menu_recent_files
         menu.clear()
-        files = [x for x in self.recent_files if x != current and exists(x)]
+        recent_exists = self._recent_exists
+        files = [x for x in self.recent_files if x != current and recent_exists.get(x, True)]
+        icon = newIcon('labels')
         for i, f in enumerate(files):
-            icon = newIcon('labels')
-            action = QAction(icon, '&%d %s' % (i + 1, QFileInfo(f).fileName()), self)
+            action = QAction(icon, f'&{i + 1} {QFileInfo(f).fileName()}', self)
             action.triggered.connect(partial(self.__load_recent, f))
             menu.addAction(action)
 
@@ -1735,23 +2085,23 @@ class MainWindow(QMainWindow):
         if label is None:
             return
         self.canvas.store_shapes()
+        self.__add_label(label)
         for item in items:
             quad: Shape = item.shape()
             quad.label = label
             self.__update_shape_color(quad)
-            item.setText('{} <font color="#{:02x}{:02x}{:02x}">●</font>'.format(
-                html.escape(quad.label), *quad.fill_color.getRgb()[:3]))
-        if self.label_list.findItemByLabel(label) is None:
-            item = self.label_list.createItemFromLabel(label)
-            self.label_list.addItem(item)
-            self.label_list.setItemLabel(item, label, self.__get_rgb_by_label(label))
+            item.setText(self.__get_html_by_label(quad.label))
         self.__set_dirty()
 
+    def __file_search_edited(self, text: str) -> None:
+        self.file_search_timer.start()
+
     def __file_search_changed(self) -> None:
-        self.__import_dir_images(
-            self.image_dir,
-            pattern=self.file_search.text(),
-            load=False)
+        self.file_search_timer.stop()
+        if self.image_dir is None:
+            return
+        self.__populate_file_list(self.file_search.text())
+        self.__refresh_file_check_state()
 
     def __file_selection_changed(self) -> None:
         if not self.__may_continue():
@@ -1764,10 +2114,12 @@ class MainWindow(QMainWindow):
             shape.selected = False
         self.quad_list.clearSelection()
         self.canvas.selected_shapes = selected_shapes
+        item = None
         for shape in self.canvas.selected_shapes:
             shape.selected = True
-            item = self.quad_list.findItemByShape(shape)
+            item = self._item_by_shape[shape]
             self.quad_list.selectItem(item)
+        if item is not None:
             self.quad_list.scrollToItem(item)
         self._noSelectionSlot = False
         n_selected = len(selected_shapes)
@@ -1778,46 +2130,79 @@ class MainWindow(QMainWindow):
     def __add_quad(self, quad: Shape) -> None:
         text = quad.label
         label_list_item = LabelListWidgetItem(text, quad)
-        self.quad_list.addItem(label_list_item)
-        if self.label_list.findItemByLabel(quad.label) is None:
-            item = self.label_list.createItemFromLabel(quad.label)
-            self.label_list.addItem(item)
-            rgb = self.__get_rgb_by_label(quad.label)
-            self.label_list.setItemLabel(item, quad.label, rgb)
+        self.__add_label(quad.label)
         self.label_dialog.add_label_history(quad.label)
-        for action in self.actions_on_shapes_present:
-            action.setEnabled(True)
         self.__update_shape_color(quad)
-        label_list_item.setText(
-            '{} <font color="#{:02x}{:02x}{:02x}">●</font>'.format(
-                html.escape(text), *quad.fill_color.getRgb()[:3]))
+        label_list_item.setText(self.__get_html_by_label(text))
+        self.quad_list.addItem(label_list_item)
+        self._item_by_shape[quad] = label_list_item
 
     def __update_shape_color(self, shape: Shape) -> None:
-        r, g, b = self.__get_rgb_by_label(shape.label)
-        shape.line_color = QColor(r, g, b)
-        shape.vertex_fill_color = QColor(r, g, b)
-        shape.hvertex_fill_color = QColor(255, 255, 255)
-        shape.fill_color = QColor(r, g, b, 128)
-        shape.select_line_color = QColor(255, 255, 255)
-        shape.select_fill_color = QColor(r, g, b, 155)
+        colors = self._label_colors.get(shape.label)
+        if colors is None:
+            r, g, b = self.__get_rgb_by_label(shape.label)
+            colors = (
+                QColor(r, g, b),
+                QColor(r, g, b),
+                QColor(255, 255, 255),
+                QColor(r, g, b, 128),
+                QColor(255, 255, 255),
+                QColor(r, g, b, 155))
+            self._label_colors[shape.label] = colors
+        (shape.line_color,
+         shape.vertex_fill_color,
+         shape.hvertex_fill_color,
+         shape.fill_color,
+         shape.select_line_color,
+         shape.select_fill_color) = colors
+
+    def __add_label(self, label: str) -> None:
+        if label in self._label_rows:
+            return
+        item = self.label_list.createItemFromLabel(label)
+        self.label_list.addItem(item)
+        self._label_rows[label] = self.label_list.count() - 1
+        self.label_list.setItemLabel(item, label, self.__get_rgb_by_label(label))
 
     def __get_rgb_by_label(self, label: str) -> tuple[int, int, int]:
-        item = self.label_list.findItemByLabel(label)
-        label_id = self.label_list.indexFromItem(item).row() + 1
+        rgb = self._label_rgbs.get(label)
+        if rgb is not None:
+            return rgb
+        label_id = self._label_rows.get(label, -1) + 1
         label_id += self._config['shift_auto_shape_color']
-        return tuple(LABEL_COLORMAP[label_id % len(LABEL_COLORMAP)].tolist())
+        rgb = LABEL_COLORMAP[label_id % len(LABEL_COLORMAP)]
+        if label in self._label_rows:
+            self._label_rgbs[label] = rgb
+        return rgb
+
+    def __get_html_by_label(self, label: str) -> str:
+        text = self._label_htmls.get(label)
+        if text is None:
+            r, g, b = self.__get_rgb_by_label(label)
+            text = f'{html.escape(label)} <font color="#{r:02x}{g:02x}{b:02x}">●</font>'
+            self._label_htmls[label] = text
+        return text
 
     def __load_quads(self, quads: list[Shape], replace: bool = True) -> None:
         self._noSelectionSlot = True
-        for quad in quads:
-            self.__add_quad(quad)
-        self.quad_list.clearSelection()
+        self.quad_list.setUpdatesEnabled(False)
+        self.label_list.setUpdatesEnabled(False)
+        try:
+            for quad in quads:
+                self.__add_quad(quad)
+            self.quad_list.clearSelection()
+        finally:
+            self.label_list.setUpdatesEnabled(True)
+            self.quad_list.setUpdatesEnabled(True)
         self._noSelectionSlot = False
+        if quads:
+            for action in self.actions_on_shapes_present:
+                action.setEnabled(True)
         self.canvas.load_shapes(quads, replace=replace)
 
     def __remove_quads(self, quads: list[Shape]) -> None:
         for quad in quads:
-            item = self.quad_list.findItemByShape(quad)
+            item = self._item_by_shape.pop(quad)
             self.quad_list.removeItem(item)
 
     def __delete_selected_quad(self) -> None:
@@ -1832,7 +2217,7 @@ class MainWindow(QMainWindow):
         self.action_paste.setEnabled(len(self._copied_shapes) > 0)
 
     def __paste_selected_shape(self) -> None:
-        self.__load_quads(self._copied_shapes, replace=False)
+        self.__load_quads([s.copy() for s in self._copied_shapes], replace=False)
         self.__set_dirty()
 
     def __label_selection_changed(self) -> None:
@@ -1852,6 +2237,7 @@ class MainWindow(QMainWindow):
         self.canvas.setShapeVisible(shape, item.checkState() == Qt.CheckState.Checked)
 
     def __label_order_changed(self) -> None:
+        self._item_by_shape = {item.shape(): item for item in self.quad_list}
         self.__set_dirty()
         self.canvas.load_shapes([item.shape() for item in self.quad_list])
 
@@ -1869,6 +2255,8 @@ class MainWindow(QMainWindow):
             self.quad_list.clearSelection()
             shape = self.canvas.set_last_label(text)
             self.__add_quad(shape)
+            for action in self.actions_on_shapes_present:
+                action.setEnabled(True)
             self.action_edit_mode.setEnabled(True)
             self.action_undo_last_point.setEnabled(False)
             self.action_undo.setEnabled(True)
@@ -1892,29 +2280,53 @@ class MainWindow(QMainWindow):
         self.action_fit_window.setChecked(False)
         self.zoom_mode = ZOOM_MODE_MANUAL_ZOOM
         self.zoom_widget.setValue(value)
+        self.zoom_values.pop(self.image_path, None)
         self.zoom_values[self.image_path] = (self.zoom_mode, value)
 
-    def __add_zoom(self, increment: float = 1.1) -> None:
-        zoom_value = self.zoom_widget.value() * increment
-        if increment > 1:
-            zoom_value = math.ceil(zoom_value)
+    def __add_zoom(self, percent: int = 110) -> None:
+        value = self.zoom_widget.value()
+        if percent > 100:
+            self.__set_zoom((value * percent + 99) // 100)
         else:
-            zoom_value = math.floor(zoom_value)
-        self.__set_zoom(zoom_value)
+            self.__set_zoom(value * percent // 100)
+
+    def __zoom_in(self) -> None:
+        self.__add_zoom(110)
+
+    def __zoom_out(self) -> None:
+        self.__add_zoom(90)
+
+    def __zoom_org(self) -> None:
+        self.__set_zoom(100)
 
     def __zoom_request(self, delta, pos) -> None:
-        canvas_width_old = self.canvas.width()
-        units = 1.1
-        if delta < 0:
-            units = 0.9
-        self.__add_zoom(units)
-        canvas_width_new = self.canvas.width()
+        self.zoom_steps += -1 if delta < 0 else 1
+        self.zoom_pos = pos
+        if not self.zoom_timer.isActive():
+            self.zoom_timer.start()
+
+    def __flush_zoom_request(self) -> None:
+        steps, pos = self.zoom_steps, self.zoom_pos
+        self.zoom_steps = 0
+        if steps == 0 or pos is None:
+            return
+        canvas = self.canvas
+        zoom_widget = self.zoom_widget
+        canvas_width_old = canvas.width()
+        value = zoom_widget.value()
+        lo, hi = zoom_widget.minimum(), zoom_widget.maximum()
+        for _ in range(abs(steps)):
+            value = min(hi, (value * 110 + 99) // 100) if steps > 0 else max(lo, value * 90 // 100)
+        self.__set_zoom(value)
+        canvas_width_new = canvas.width()
         if canvas_width_old != canvas_width_new:
             canvas_scale_factor = canvas_width_new / canvas_width_old
-            x_shift = round(pos.x() * canvas_scale_factor) - pos.x()
-            y_shift = round(pos.y() * canvas_scale_factor) - pos.y()
-            self.__set_scroll(Qt.Orientation.Horizontal, self.scroll_bars[Qt.Orientation.Horizontal].value() + x_shift)
-            self.__set_scroll(Qt.Orientation.Vertical, self.scroll_bars[Qt.Orientation.Vertical].value() + y_shift)
+            px, py = pos.x(), pos.y()
+            x_shift = round(px * canvas_scale_factor) - px
+            y_shift = round(py * canvas_scale_factor) - py
+            bars = self.scroll_bars
+            self.__set_scroll(Qt.Orientation.Horizontal, bars[Qt.Orientation.Horizontal].value() + x_shift)
+            self.__set_scroll(Qt.Orientation.Vertical, bars[Qt.Orientation.Vertical].value() + y_shift)
 
     def __set_fit_window(self) -> None:
         self.action_fit_width.setChecked(False)
@@ -1935,7 +2347,7 @@ class MainWindow(QMainWindow):
 
     def __brightness_contrast(self, value) -> None:
         dialog = BrightnessContrastDialog(
-            img_data_to_pil(self.image_data),
+            img_qt_to_pil(self.image),
             self.__on_new_brightness_contrast,
             parent=self)
         brightness, contrast = self.brightness_contrast_values.get(self.image_path, (None, None))
@@ -1949,31 +2361,67 @@ class MainWindow(QMainWindow):
         self.brightness_contrast_values[self.image_path] = (brightness, contrast)
 
     def __toggle_polygons(self, value) -> None:
-        flag = value
-        for item in self.quad_list:
-            if value is None:
-                flag = item.checkState() == Qt.CheckState.Unchecked
-            item.setCheckState(Qt.CheckState.Checked if flag else Qt.CheckState.Unchecked)
+        checked, unchecked = Qt.CheckState.Checked, Qt.CheckState.Unchecked
+        visibility = {}
+        model = self.quad_list.model()
+        self.quad_list.setUpdatesEnabled(False)
+        model.blockSignals(True)
+        try:
+            for item in self.quad_list:
+                state = item.checkState()
+                if value is None:
+                    desired = checked if state == unchecked else unchecked
+                else:
+                    desired = checked if value else unchecked
+                if state != desired:
+                    item.setCheckState(desired)
+                    visibility[item.shape()] = desired == checked
+        finally:
+            model.blockSignals(False)
+            self.quad_list.setUpdatesEnabled(True)
+        self.quad_list.viewport().update()
+        self.canvas.setShapesVisible(visibility)
+
+    def __hide_all_quads(self) -> None:
+        self.__toggle_polygons(False)
+
+    def __show_all_quads(self) -> None:
+        self.__toggle_polygons(True)
+
+    def __toggle_all_quads(self) -> None:
+        self.__toggle_polygons(None)
 
     def __paint_canvas(self) -> None:
         assert not self.image.isNull(), 'cannot paint null image'
-        self.canvas.scale = 0.01 * self.zoom_widget.value()
-        self.canvas.adjustSize()
-        self.canvas.update()
+        canvas = self.canvas
+        canvas.scale = 0.01 * self.zoom_widget.value()
+        size = canvas.size()
+        canvas.adjustSize()
+        if canvas.size() == size:
+            canvas.update()
 
     def __adjust_scale(self, initial: bool = False) -> None:
-        value = self.scalers[ZOOM_MODE_FIT_WINDOW if initial else self.zoom_mode]()
-        value = int(100 * value)
+        mode = ZOOM_MODE_FIT_WINDOW if initial else self.zoom_mode
+        central = self.centralWidget()
+        pixmap = self.canvas.pixmap
+        key = (mode, central.width(), central.height(), pixmap.width(), pixmap.height())
+        if key == self._fit_scale[0]:
+            value = self._fit_scale[1]
+        else:
+            value = int(100 * self.scalers[mode]())
+            self._fit_scale = (key, value)
         self.zoom_widget.setValue(value)
         self.zoom_values[self.image_path] = (self.zoom_mode, value)
 
     def __scale_fit_window(self):
         e = 2.0
-        w1 = self.centralWidget().width() - e
-        h1 = self.centralWidget().height() - e
+        central = self.centralWidget()
+        pixmap = self.canvas.pixmap
+        w1 = central.width() - e
+        h1 = central.height() - e
         a1 = w1 / h1
-        w2 = self.canvas.pixmap.width() - 0.0
-        h2 = self.canvas.pixmap.height() - 0.0
+        w2 = pixmap.width() - 0.0
+        h2 = pixmap.height() - 0.0
         a2 = w2 / h2
         return w1 / w2 if a2 >= a1 else h1 / h2
 
@@ -2020,8 +2468,17 @@ class MainWindow(QMainWindow):
     def __may_continue(self) -> None:
         if not self.dirty:
             return True
-        msg = self.tr('Save annotations to "{}" before closing?').format(self.image_path)
-        answer = QMB.question(self, self.tr('Save annotations?'), msg, QMB.Save | QMB.Discard | QMB.Cancel, QMB.Save)
+        answer = self._dirty_policy
+        if answer is None:
+            msg_box = QMB(QMB.Question, self.tr('Save annotations?'),
+                          self.tr('Save annotations to "{}" before closing?').format(self.image_path),
+                          QMB.Save | QMB.Discard | QMB.Cancel, self)
+            msg_box.setDefaultButton(QMB.Save)
+            check_box = QCheckBox(self.tr('Apply to all in this session'), msg_box)
+            msg_box.setCheckBox(check_box)
+            answer = msg_box.exec_()
+            if check_box.isChecked() and answer in (QMB.Save, QMB.Discard):
+                self._dirty_policy = answer
         if answer == QMB.Discard:
             return True
         elif answer == QMB.Save:
@@ -2068,45 +2525,102 @@ class MainWindow(QMainWindow):
             self.__load()
         self.__refresh_file_check_state()
 
-    def __import_dir_images(self, dirpath: str, pattern: Optional[str] = None) -> None:
+    def __import_dir_images(self, dirpath: str, pattern: Optional[str] = None, load: bool = True) -> None:
         self.action_open_next.setEnabled(True)
         self.action_open_prev.setEnabled(True)
         if not self.__may_continue() or not dirpath:
             return
         self.image_dir = dirpath
-        self.image_path = None
-        image_paths = self.__scan_all_images(dirpath)
+        self.__reset_state()
+        self.__set_clean()
+        self.canvas.setEnabled(False)
+        self.__toggle_actions(False)
+        self._scan_token += 1
+        self._scan_request = (pattern, load)
+        try:
+            mtime = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            self.__image_names_ready(self._scan_token, dirpath, None, [])
+            return
+        cached = self._scan_cache.get(dirpath)
+        if (cached is not None) and (cached[0] == mtime):
+            self.__image_names_ready(self._scan_token, dirpath, mtime, cached[1])
+            return
+        self.image_names = []
+        self.__populate_file_list()
+        self.__status(self.tr(f'Scanning {dirpath}...'))
+        worker = ImageScanWorker(self._scan_token, dirpath, mtime)
+        worker.signals.finished.connect(self.__image_names_ready)
+        self._scan_worker = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def __image_names_ready(self, token: int, dir_path: str, mtime: Optional[int], names: list[str]) -> None:
+        if (token != self._scan_token) or (dir_path != self.image_dir):
+            return
+        self._scan_worker = None
+        if mtime is not None:
+            self._scan_cache[dir_path] = (mtime, names)
+        self.image_names = names
+        pattern, load = self._scan_request
+        self.__populate_file_list(pattern)
+        self.__refresh_file_check_state()
+        if load:
+            self.__open_next()
+
+    def __populate_file_list(self, pattern: Optional[str] = None) -> None:
+        image_paths = self.image_names
         if pattern:
-            try:
-                image_paths = [x for x in image_paths if re.search(pattern, x)]
-            except re.error:
-                pass
+            if self._search_pattern[0] != pattern:
+                try:
+                    self._search_pattern = (pattern, re.compile(pattern))
+                except re.error:
+                    self._search_pattern = (pattern, None)
+            compiled = self._search_pattern[1]
+            if compiled is not None:
+                search = compiled.search
+                image_paths = [x for x in image_paths if search(x)]
         qt_disconnect_signal_safely(
             self.file_list.itemSelectionChanged,
             self.__file_selection_changed)
-        self.file_list.clear()
-        for image_path in image_paths:
-            item = QListWidgetItem(osp.basename(image_path))
-            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            self.file_list.addItem(item)
+        self.file_list.setUpdatesEnabled(False)
+        try:
+            self.file_list.clear()
+            self.file_list.addItems(image_paths)
+            flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+            item_at = self.file_list.item
+            self._file_items = {}
+            for i, image_path in enumerate(image_paths):
+                item = item_at(i)
+                item.setFlags(flags)
+                self._file_items[image_path] = item
+        finally:
+            self.file_list.setUpdatesEnabled(True)
         qt_connect_signal_safely(
             self.file_list.itemSelectionChanged,
             self.__file_selection_changed)
-        self.__refresh_file_check_state()
-        self.__open_next()
 
     def __refresh_file_check_state(self) -> None:
         if (self.image_dir is None) or \
            (self.annot_dir is None):
             return
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            image_path = osp.join(self.image_dir, item.text())
-            annot_path = osp.join(self.annot_dir, osp.splitext(osp.basename(image_path))[0] + '.json')
-            if QFile.exists(annot_path) and (osp.splitext(annot_path)[1].lower() == '.json'):
-                item.setCheckState(Qt.CheckState.Checked)
-            else:
-                item.setCheckState(Qt.CheckState.Unchecked)
+        try:
+            with os.scandir(self.annot_dir) as it:
+                annot_names = {e.name for e in it if e.name.endswith('.json') and e.is_file()}
+        except OSError:
+            annot_names = set()
+        self.file_list.setUpdatesEnabled(False)
+        try:
+            item_at = self.file_list.item
+            checked, unchecked = Qt.CheckState.Checked, Qt.CheckState.Unchecked
+            for i in range(self.file_list.count()):
+                item = item_at(i)
+                name = item.text()
+                dot = name.rfind('.')
+                state = checked if (name[:dot] if dot > 0 else name) + '.json' in annot_names else unchecked
+                if item.checkState() != state:
+                    item.setCheckState(state)
+        finally:
+            self.file_list.setUpdatesEnabled(True)
 
     def __current_image_path(self) -> Optional[str]:
         if (self.file_list.currentRow() < 0) or \
@@ -2120,17 +2634,8 @@ class MainWindow(QMainWindow):
            (self.annot_dir is None):
             return None
         filename = self.file_list.currentItem().text()
-        filename = osp.splitext(filename)[0] + '.json'
-        return osp.join(self.annot_dir, filename)
-
-    def __scan_all_images(self, dir_path: str) -> list[str]:
-        if os.name == 'nt':
-            extensions = ['.jpg', '.jpeg', '.png']
-        else:
-            extensions = ['.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG']
-        files = list_files_with_exts(dir_path, extensions)
-        files = [osp.basename(x) for x in files]
-        return natsort.os_sorted(files)
+        dot = filename.rfind('.')
+        return osp.join(self.annot_dir, (filename[:dot] if dot > 0 else filename) + '.json')
 
     def __new_action(
             self,
@@ -2164,10 +2669,7 @@ class MainWindow(QMainWindow):
         return a
 
     def __new_icon(self, icon: str) -> QIcon:
-        path = osp.join('icon', icon)
-        if hasattr(sys, '_MEIPASS'):
-            path = osp.join(sys._MEIPASS, path)
-        return QIcon(QPixmap(path))
+        return newIcon(icon)
 
 
 def update_dict(target_dict, new_dict, validate_item=None):
@@ -2338,31 +2840,23 @@ def get_config(config_file_or_yaml=None, config_from_args=None):
     return config
 
 
-def img_data_to_pil(img_data) -> PIL.ImageFile:
-    f = io.BytesIO()
-    f.write(img_data)
-    img_pil = PIL.Image.open(f)
-    return img_pil
+def adjust_brightness_contrast(img: PIL.Image.Image, brightness: float, contrast: float) -> QImage:
+    if brightness != 1:
+        img = PIL.ImageEnhance.Brightness(img).enhance(brightness)
+    if contrast != 1:
+        img = PIL.ImageEnhance.Contrast(img).enhance(contrast)
+    return QImage(img.tobytes(), img.width, img.height, img.width * 3, QImage.Format.Format_RGB888)
 
 
 def newIcon(icon):
-    path = osp.join('icon', icon)
-    if hasattr(sys, '_MEIPASS'):
-        path = osp.join(sys._MEIPASS, path)
-    return QIcon(QPixmap(path))
-
-
-def load_image_file(filename: str) -> bytes:
-    image_pil = PIL.Image.open(filename)
-    with io.BytesIO() as f:
-        ext = osp.splitext(filename)[1].lower()
-        if ext in ['.jpg', '.jpeg']:
-            format = 'JPEG'
-        else:
-            format = 'PNG'
-        image_pil.save(f, format=format)
-        f.seek(0)
-        return f.read()
+    qicon = ICON_CACHE.get(icon)
+    if qicon is None:
+        path = osp.join('icon', icon)
+        if hasattr(sys, '_MEIPASS'):
+            path = osp.join(sys._MEIPASS, path)
+        qicon = QIcon(QPixmap(path))
+        ICON_CACHE[icon] = qicon
+    return qicon
 
 
 def addActions(widget, actions):
@@ -2391,6 +2885,21 @@ def img_qt_to_arr(img_qt):
     return img_arr
 
 
+def img_qt_to_pil(img_qt: QImage) -> PIL.Image.Image:
+    img_qt = img_qt.convertToFormat(QImage.Format.Format_RGB888)
+    w, h, bpl = img_qt.width(), img_qt.height(), img_qt.bytesPerLine()
+    ptr = img_qt.constBits()
+    ptr.setsize(bpl * h)
+    arr = np.frombuffer(ptr, dtype=np.uint8).reshape(h, bpl)[:, :w * 3].reshape(h, w, 3)
+    return PIL.Image.fromarray(arr, 'RGB')
+
+
+def shapes_to_points_array(shapes: list[Shape]) -> np.ndarray:
+    if not shapes:
+        return np.empty((0, 4, 2), dtype=np.float64)
+    return np.stack([s.points_array()[:4] for s in shapes])
+
+
 def distance(p):
     return math.sqrt(p.x() * p.x() + p.y() * p.y())
 
@@ -2409,17 +2918,23 @@ def distancetoline(point, line):
     return np.linalg.norm(np.cross(p2 - p1, p1 - p3)) / np.linalg.norm(p2 - p1)
 
 
-def list_files_with_exts(path: str, ext: str | list[str], recursive: bool = False) -> list[str]:
-    if recursive:
-        wildcard = osp.join('**', '*')
-    else:
-        wildcard = '*'
-    if type(ext) is str:
-        return glob(osp.join(path, f'{wildcard}{ext}'), recursive=recursive)
-    paths = []
-    for _ext in ext:
-        paths += glob(osp.join(path, f'{wildcard}{_ext}'), recursive=recursive)
-    return paths
+def scan_image_names(path: str) -> list[str]:
+    names = []
+    last_ext = IMAGE_EXTENSIONS[0]
+    with os.scandir(path) as it:
+        for entry in it:
+            name = entry.name
+            if name.startswith('.'):
+                continue
+            low = name.lower()
+            if not low.endswith(last_ext):
+                ext = next((e for e in IMAGE_EXTENSIONS if low.endswith(e)), None)
+                if ext is None:
+                    continue
+                last_ext = ext
+            if entry.is_file():
+                names.append(name)
+    return names
 
 
 def qt_connect_signal_safely(signal, handler):
@@ -2500,6 +3015,7 @@ def main():
         osp.dirname(osp.abspath(__file__)) + '/translate')
     app = QApplication(sys.argv)
     app.setApplicationName(__appname__)
+    QPixmapCache.setCacheLimit(PIXMAP_CACHE_LIMIT)
     app.setWindowIcon(newIcon('icon'))
     app.installTranslator(translator)
     win = MainWindow(config=config)